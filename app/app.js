@@ -13,6 +13,8 @@ function App() {
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('dashboard');
   const [loadingAnalysis, setLoadingAnalysis] = useState(false);
+  const [streamingInsights, setStreamingInsights] = useState('');
+  const [analysisError, setAnalysisError] = useState(null);
 
   useEffect(() => {
     fetchDashboardData();
@@ -54,12 +56,44 @@ function App() {
 
   const analyzeCluster = async (clusterId) => {
     setLoadingAnalysis(true);
+    setStreamingInsights('');
+    setAnalysisError(null);
+    setAnalysis(null);
     try {
       const response = await fetch(`${API_URL}/api/clusters/${clusterId}/analyze`, {
         method: 'POST'
       });
-      const analysisData = await response.json();
-      setAnalysis(analysisData);
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        setAnalysisError(errorData.detail || `Error analyzing cluster (HTTP ${response.status})`);
+        setLoadingAnalysis(false);
+        return;
+      }
+      
+      // The analysis streams as server-sent events: insight chunks, then the full result
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let insights = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue;
+          const payload = JSON.parse(event.slice(6));
+          if (payload.type === 'insights') {
+            insights += payload.text;
+            setStreamingInsights(insights);
+          } else if (payload.type === 'analysis') {
+            setAnalysis(payload.analysis);
+          } else if (payload.type === 'error') {
+            setAnalysisError(payload.detail);
+          }
+        }
+      }
       
       // Fetch recommendations
       const recResponse = await fetch(`${API_URL}/api/clusters/${clusterId}/recommendations`);
@@ -67,6 +101,7 @@ function App() {
       setRecommendations(recData);
     } catch (error) {
       console.error('Error analyzing cluster:', error);
+      setAnalysisError('Error analyzing cluster. Please try again.');
     }
     setLoadingAnalysis(false);
   };
@@ -349,7 +384,7 @@ function App() {
                       </div>
                       <div className="flex justify-between">
                         <span className="text-sm text-gray-600">Nodes</span>
-                        <span className="text-sm font-medium text-gray-900">{cluster.nodes.length}</span>
+                        <span className="text-sm font-medium text-gray-900">{cluster.summary.node_count}</span>
                       </div>
                       <div className="flex justify-between">
                         <span className="text-sm text-gray-600">Monthly Cost</span>
@@ -411,6 +446,18 @@ function App() {
                 <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600 mx-auto mb-4"></div>
                 <h3 className="text-lg font-medium text-gray-900 mb-2">AI Analysis in Progress</h3>
                 <p className="text-gray-600">Our AI is analyzing your cluster for cost optimization opportunities...</p>
+                {streamingInsights && (
+                  <div className="mt-6 mx-6 bg-gray-50 rounded-lg p-4 text-left text-gray-700 whitespace-pre-wrap text-sm leading-relaxed">
+                    {streamingInsights}
+                  </div>
+                )}
+              </div>
+            )}
+
+            {analysisError && !loadingAnalysis && (
+              <div className="bg-red-50 border border-red-200 rounded-xl p-6">
+                <h3 className="text-lg font-medium text-red-800 mb-2">Analysis Failed</h3>
+                <p className="text-sm text-red-700">{analysisError}</p>
               </div>
             )}
 
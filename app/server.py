@@ -1,21 +1,125 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from pymongo import AsyncMongoClient, UpdateOne
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 import os
-from datetime import datetime, timezone, timedelta
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone, timedelta
 import uuid
 import asyncio
 from dotenv import load_dotenv
 import json
 import random
+import hashlib
+import re
+import functools
+import time
+import numpy as np
 
 # Load environment variables
 load_dotenv()
 
+# Redis
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    print("Warning: redis not installed")
+    aioredis = None
+
+# Response cache (Redis)
+try:
+    from fastapi_cache import FastAPICache
+    from fastapi_cache.backends.redis import RedisBackend
+    from fastapi_cache.decorator import cache
+    if aioredis is None:
+        raise ImportError("redis")
+except ImportError:
+    print("Warning: fastapi-cache2 not installed, response caching disabled")
+    FastAPICache = None
+
+    def cache(*args, **kwargs):
+        return lambda func: func
+
+redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379')
+CACHE_TTL_SECONDS = 30
+
+async def invalidate_cache(*namespaces: str):
+    if FastAPICache is None:
+        return
+    for namespace in namespaces:
+        try:
+            await FastAPICache.clear(namespace=namespace)
+        except Exception as e:
+            # The write this follows has already succeeded; stale entries expire on their own
+            print(f"Warning: cache invalidation failed for {namespace}: {str(e)}")
+
+# MongoDB connection
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+mongo_pool_options = {
+    "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+    "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', 10)),
+    "serverSelectionTimeoutMS": 2000,
+    "maxIdleTimeMS": 60000,
+}
+client: Optional[AsyncMongoClient] = None
+db = None
+
+async def warm_up_connections():
+    # Open pooled connections before the first request burst instead of lazily
+    await db.command("ping")
+    await asyncio.gather(
+        db.clusters.find_one({}, projection={"_id": 1}),
+        db.alerts.find_one({}, projection={"_id": 1}),
+        db.cost_analyses.find_one({}, projection={"_id": 1})
+    )
+
+async def create_indexes():
+    # Lookups filter on the application-level UUID, not Mongo's _id
+    await db.clusters.create_index("id", unique=True)
+    await db.alerts.create_index("id", unique=True)
+    await db.cost_analyses.create_index("id", unique=True)
+    await db.cost_analyses.create_index("cluster_id")
+
+async def backfill_cluster_summaries():
+    # List views project summary only, so older documents need one stored
+    updates = []
+    async for cluster in db.clusters.find({"summary": {"$exists": False}}, projection={"_id": 0, "id": 1, "nodes": 1}):
+        summary = summarize_nodes([ClusterNode(**node) for node in cluster.get('nodes', [])])
+        updates.append(UpdateOne({"id": cluster['id']}, {"$set": {"summary": summary.model_dump(mode='json')}}))
+    if updates:
+        await db.clusters.bulk_write(updates, ordered=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db
+    # Warm up the LLM client and embedding model concurrently with the rest of startup
+    llm_warmup = asyncio.create_task(ai_service.warm_up())
+    encoder_warmup = asyncio.create_task(llm_cache.warm_up())
+    # Create the client inside the running loop so it binds to it
+    client = AsyncMongoClient(mongo_url, **mongo_pool_options)
+    db = client.kubernetes_cost_optimizer
+    redis = None
+    try:
+        await warm_up_connections()
+        await create_indexes()
+        await backfill_cluster_summaries()
+        if aioredis is not None:
+            redis = aioredis.from_url(redis_url)
+            llm_cache.redis = redis
+            if FastAPICache is not None:
+                FastAPICache.init(RedisBackend(redis), prefix="k8s-cost-optimizer")
+        yield
+    finally:
+        llm_warmup.cancel()
+        encoder_warmup.cancel()
+        if redis is not None:
+            await redis.aclose()
+        await client.close()
+
 # Initialize FastAPI app
-app = FastAPI(title="Kubernetes Cost Optimization Platform", version="1.0.0")
+app = FastAPI(title="Kubernetes Cost Optimization Platform", version="1.0.0", lifespan=lifespan)
 
 
 # CORS middleware
@@ -27,11 +131,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB connection
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client.kubernetes_cost_optimizer
-
 # LLM Integration
 try:
     from emergentintegrations.llm.chat import LlmChat, UserMessage
@@ -43,9 +142,20 @@ except ImportError:
     LlmChat = None
     UserMessage = None
 
+# Time-sortable IDs
+try:
+    from ulid import ULID
+except ImportError:
+    print("Warning: python-ulid not installed, falling back to random UUID4 ids")
+    ULID = None
+
+def new_id() -> str:
+    """ULIDs sort by creation time, so inserts land at the end of the id index"""
+    return str(ULID()) if ULID else str(uuid.uuid4())
+
 # Pydantic Models
 class ClusterNode(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     cpu_capacity: float
     memory_capacity: float
@@ -56,17 +166,65 @@ class ClusterNode(BaseModel):
     zone: str
     status: str
 
+class ClusterResourceSummary(BaseModel):
+    node_count: int
+    total_cpu_capacity: float
+    total_memory_capacity: float
+    avg_cpu_usage: float
+    avg_memory_usage: float
+
+def summarize_nodes(nodes: List[ClusterNode]) -> ClusterResourceSummary:
+    """Aggregate node metrics once so reads don't have to walk the node list"""
+    if not nodes:
+        return ClusterResourceSummary(node_count=0, total_cpu_capacity=0, total_memory_capacity=0, avg_cpu_usage=0, avg_memory_usage=0)
+    
+    # One pass builds a (nodes x metrics) array; column sums/means give every metric at once
+    metrics = np.asarray(
+        [[node.cpu_capacity, node.memory_capacity, node.cpu_usage, node.memory_usage] for node in nodes],
+        dtype=np.float64
+    )
+    total_cpu_capacity, total_memory_capacity, _, _ = metrics.sum(axis=0)
+    _, _, avg_cpu_usage, avg_memory_usage = metrics.mean(axis=0)
+    return ClusterResourceSummary(
+        node_count=len(nodes),
+        total_cpu_capacity=float(total_cpu_capacity),
+        total_memory_capacity=float(total_memory_capacity),
+        avg_cpu_usage=float(avg_cpu_usage),
+        avg_memory_usage=float(avg_memory_usage)
+    )
+
 class ClusterInfo(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     provider: str
     region: str
     nodes: List[ClusterNode]
     total_cost: float
+    summary: Optional[ClusterResourceSummary] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @model_validator(mode="after")
+    def fill_summary(self):
+        # Documents stored before summaries existed get one computed on load
+        if self.summary is None:
+            self.summary = summarize_nodes(self.nodes)
+        return self
+
+class ClusterSummary(BaseModel):
+    """List view of a cluster; the node list is only served by the detail endpoint"""
+    id: str
+    name: str
+    provider: str
+    region: str
+    total_cost: float
+    summary: ClusterResourceSummary
+    created_at: datetime
+
+CLUSTER_SUMMARY_PROJECTION = {field: 1 for field in ClusterSummary.model_fields} | {"_id": 0}
+LIST_BATCH_SIZE = 500
+
 class CostAnalysis(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     cluster_id: str
     analysis_type: str
     recommendations: List[str]
@@ -76,7 +234,7 @@ class CostAnalysis(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class OptimizationRecommendation(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     cluster_id: str
     type: str
     description: str
@@ -86,7 +244,7 @@ class OptimizationRecommendation(BaseModel):
     priority: str
 
 class AnomalyAlert(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     cluster_id: str
     alert_type: str
     description: str
@@ -94,84 +252,241 @@ class AnomalyAlert(BaseModel):
     detected_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     resolved: bool = False
 
+# Semantic cache for LLM responses
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    print("Warning: sentence-transformers not installed, semantic LLM cache disabled")
+    SentenceTransformer = None
+
+class LLMResponseCache:
+    """Two-tier LLM response cache: exact key in Redis, then embedding similarity.
+
+    Semantic matches are only considered among entries with the same scope
+    (cluster id plus metrics rounded to whole units) and younger than the TTL,
+    since prompts for different clusters differ only in a few numbers.
+    """
+
+    def __init__(self, ttl: int = 3600, similarity_threshold: float = 0.97, max_entries: int = 1000):
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.redis = None
+        self.encoder = None
+        self.encoder_failed = False
+        self._encoder_lock = asyncio.Lock()
+        self.embeddings = None
+        self.scopes: List[Tuple[str, ...]] = []
+        self.stored_at = np.empty(0)
+        self.responses: List[str] = []
+
+    @staticmethod
+    def make_key(data: Dict[str, Any]) -> str:
+        normalized = {k: round(v, 1) if isinstance(v, float) else v for k, v in data.items()}
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+        return f"llm-cache:{digest}"
+
+    @staticmethod
+    def make_scope(cluster_id: str, data: Dict[str, Any]) -> Tuple[str, str]:
+        coarse = {k: round(v) if isinstance(v, float) else v for k, v in data.items()}
+        return cluster_id, json.dumps(coarse, sort_keys=True)
+
+    async def _load_encoder(self):
+        """Load the embedding model once; a failed load disables the semantic tier"""
+        if self.encoder is not None or self.encoder_failed or SentenceTransformer is None:
+            return self.encoder
+        async with self._encoder_lock:
+            if self.encoder is None and not self.encoder_failed:
+                try:
+                    self.encoder = await asyncio.to_thread(SentenceTransformer, "sentence-transformers/all-MiniLM-L6-v2")
+                except Exception as e:
+                    print(f"Warning: embedding model failed to load, semantic LLM cache disabled: {str(e)}")
+                    self.encoder_failed = True
+        return self.encoder
+
+    async def warm_up(self):
+        await self._load_encoder()
+
+    async def _embed(self, text: str):
+        encoder = await self._load_encoder()
+        if encoder is None:
+            return None
+        try:
+            return await asyncio.to_thread(encoder.encode, text, normalize_embeddings=True)
+        except Exception as e:
+            print(f"Warning: LLM cache embedding failed: {str(e)}")
+            return None
+
+    async def lookup(self, key: str, scope: Tuple[str, ...], prompt: str):
+        """Return (cached_response, prompt_embedding); the embedding is reused by store()."""
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+                if cached is not None:
+                    return cached.decode(), None
+            except Exception as e:
+                print(f"Warning: LLM cache lookup failed: {str(e)}")
+        
+        embedding = await self._embed(prompt)
+        if embedding is not None and self.embeddings is not None:
+            valid = np.array([entry_scope == scope for entry_scope in self.scopes]) & (time.time() - self.stored_at < self.ttl)
+            scores = np.where(valid, self.embeddings @ embedding, -1.0)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                return self.responses[best], embedding
+        return None, embedding
+
+    async def store(self, key: str, scope: Tuple[str, ...], embedding, response: str):
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, response, ex=self.ttl)
+            except Exception as e:
+                print(f"Warning: LLM cache store failed: {str(e)}")
+        
+        if embedding is None:
+            return
+        now = time.time()
+        if self.embeddings is None:
+            self.embeddings = embedding[np.newaxis, :]
+        else:
+            # Drop expired entries, then cap the index at max_entries
+            fresh = now - self.stored_at < self.ttl
+            self.embeddings = np.vstack([self.embeddings[fresh], embedding])[-self.max_entries:]
+            self.scopes = [entry_scope for entry_scope, keep in zip(self.scopes, fresh) if keep]
+            self.stored_at = self.stored_at[fresh]
+            self.responses = [entry for entry, keep in zip(self.responses, fresh) if keep]
+        self.scopes = (self.scopes + [scope])[-self.max_entries:]
+        self.stored_at = np.append(self.stored_at, now)[-self.max_entries:]
+        self.responses = (self.responses + [response])[-self.max_entries:]
+
+llm_cache = LLMResponseCache()
+
 # AI Chat Service
+# Static instructions go first and cluster metrics last, so consecutive
+# requests share a prompt prefix the provider can cache.
+ANALYST_SYSTEM_MESSAGE = "You are an expert Kubernetes cost optimization analyst. Provide detailed, actionable insights about cluster costs, resource utilization, and optimization opportunities. Always include specific recommendations and estimated savings."
+
+COST_ANALYSIS_INSTRUCTIONS = """Analyze the Kubernetes cluster described at the end of this message for cost optimization opportunities.
+
+Provide a comprehensive cost analysis including:
+1. Current cost efficiency assessment
+2. Resource utilization insights
+3. Specific optimization recommendations
+4. Estimated potential savings
+5. Priority action items
+"""
+
+# Matches numbered list items such as "1. ..." or "  2) ..."
+_NUMBERED_LINE = re.compile(r'^\s*\d')
+
+RECOMMENDATION_INSTRUCTIONS = """Generate 5 specific, actionable optimization recommendations for the Kubernetes cluster described at the end of this message.
+
+Focus on recommendations that can provide immediate cost savings while maintaining performance.
+Return only the recommendations as a numbered list.
+"""
+
 class AIAnalysisService:
     def __init__(self):
         self.llm_chat = None
-        if LlmChat and emergent_llm_key:
-            self.llm_chat = LlmChat(
-                api_key=emergent_llm_key,
-                session_id="k8s-cost-optimizer",
-                system_message="You are an expert Kubernetes cost optimization analyst. Provide detailed, actionable insights about cluster costs, resource utilization, and optimization opportunities. Always include specific recommendations and estimated savings."
-            ).with_model("openai", "gpt-4o")
+        self._chat_lock = asyncio.Lock()
+    
+    def _build_chat(self):
+        return LlmChat(
+            api_key=emergent_llm_key,
+            session_id="k8s-cost-optimizer",
+            system_message=ANALYST_SYSTEM_MESSAGE
+        ).with_model("openai", "gpt-4o")
+    
+    async def _ensure_chat(self):
+        """Build the LLM client on first use, off the event loop"""
+        if self.llm_chat is None and LlmChat and emergent_llm_key:
+            async with self._chat_lock:
+                if self.llm_chat is None:
+                    self.llm_chat = await asyncio.to_thread(self._build_chat)
+        return self.llm_chat
+    
+    async def warm_up(self):
+        """Build the LLM client ahead of the first request; failures are retried on use"""
+        try:
+            await self._ensure_chat()
+        except Exception as e:
+            print(f"Warning: LLM client warmup failed: {str(e)}")
     
     async def analyze_cluster_costs(self, cluster: ClusterInfo) -> str:
-        if not self.llm_chat:
-            return "AI analysis unavailable - LLM integration not configured"
-        
-        cluster_data = {
-            "name": cluster.name,
-            "provider": cluster.provider,
-            "total_cost": cluster.total_cost,
-            "node_count": len(cluster.nodes),
-            "total_cpu_capacity": sum(node.cpu_capacity for node in cluster.nodes),
-            "total_memory_capacity": sum(node.memory_capacity for node in cluster.nodes),
-            "avg_cpu_utilization": sum(node.cpu_usage for node in cluster.nodes) / len(cluster.nodes) if cluster.nodes else 0,
-            "avg_memory_utilization": sum(node.memory_usage for node in cluster.nodes) / len(cluster.nodes) if cluster.nodes else 0
-        }
-        
-        prompt = f"""
-        Analyze this Kubernetes cluster for cost optimization opportunities:
-        
-        Cluster: {cluster_data['name']} ({cluster_data['provider']})
-        Monthly Cost: ${cluster_data['total_cost']:.2f}
-        Nodes: {cluster_data['node_count']}
-        Total CPU: {cluster_data['total_cpu_capacity']} cores
-        Total Memory: {cluster_data['total_memory_capacity']} GB
-        Avg CPU Utilization: {cluster_data['avg_cpu_utilization']:.1f}%
-        Avg Memory Utilization: {cluster_data['avg_memory_utilization']:.1f}%
-        
-        Provide a comprehensive cost analysis including:
-        1. Current cost efficiency assessment
-        2. Resource utilization insights
-        3. Specific optimization recommendations
-        4. Estimated potential savings
-        5. Priority action items
-        """
-        
+        return "".join([chunk async for chunk in self.analyze_cluster_costs_stream(cluster)])
+    
+    async def analyze_cluster_costs_stream(self, cluster: ClusterInfo) -> AsyncIterator[str]:
+        """Yield the cost analysis text as the LLM generates it"""
         try:
+            llm_chat = await self._ensure_chat()
+            if not llm_chat:
+                yield "AI analysis unavailable - LLM integration not configured"
+                return
+            
+            cluster_data = {
+                "name": cluster.name,
+                "provider": cluster.provider,
+                "total_cost": cluster.total_cost,
+                "node_count": cluster.summary.node_count,
+                "total_cpu_capacity": cluster.summary.total_cpu_capacity,
+                "total_memory_capacity": cluster.summary.total_memory_capacity,
+                "avg_cpu_utilization": cluster.summary.avg_cpu_usage,
+                "avg_memory_utilization": cluster.summary.avg_memory_usage
+            }
+            
+            prompt = COST_ANALYSIS_INSTRUCTIONS + f"""
+Cluster: {cluster_data['name']} ({cluster_data['provider']})
+Monthly Cost: ${cluster_data['total_cost']:.2f}
+Nodes: {cluster_data['node_count']}
+Total CPU: {cluster_data['total_cpu_capacity']} cores
+Total Memory: {cluster_data['total_memory_capacity']} GB
+Avg CPU Utilization: {cluster_data['avg_cpu_utilization']:.1f}%
+Avg Memory Utilization: {cluster_data['avg_memory_utilization']:.1f}%
+"""
+            
+            cache_key = llm_cache.make_key(cluster_data)
+            cache_scope = llm_cache.make_scope(cluster.id, cluster_data)
+            cached, embedding = await llm_cache.lookup(cache_key, cache_scope, prompt)
+            if cached is not None:
+                yield cached
+                return
+            
             user_message = UserMessage(text=prompt)
-            response = await self.llm_chat.send_message(user_message)
-            return response
+            chunks = []
+            send_message_stream = getattr(llm_chat, "send_message_stream", None)
+            if send_message_stream is None:
+                # Integration without streaming support: emit the whole response at once
+                chunks.append(await llm_chat.send_message(user_message))
+                yield chunks[-1]
+            else:
+                async for chunk in send_message_stream(user_message):
+                    chunks.append(chunk)
+                    yield chunk
+            await llm_cache.store(cache_key, cache_scope, embedding, "".join(chunks))
         except Exception as e:
-            return f"AI analysis error: {str(e)}"
+            yield f"AI analysis error: {str(e)}"
     
     async def generate_recommendations(self, cluster: ClusterInfo) -> List[str]:
-        if not self.llm_chat:
-            return [
-                "Enable cluster autoscaling to optimize node count",
-                "Review resource requests and limits for over-provisioning",
-                "Consider spot/preemptible instances for non-critical workloads"
-            ]
-        
-        prompt = f"""
-        Generate 5 specific, actionable optimization recommendations for this Kubernetes cluster:
-        
-        Cluster: {cluster.name}
-        Provider: {cluster.provider}
-        Current monthly cost: ${cluster.total_cost}
-        Nodes: {len(cluster.nodes)}
-        
-        Focus on recommendations that can provide immediate cost savings while maintaining performance.
-        Return only the recommendations as a numbered list.
-        """
-        
         try:
+            llm_chat = await self._ensure_chat()
+            if not llm_chat:
+                return [
+                    "Enable cluster autoscaling to optimize node count",
+                    "Review resource requests and limits for over-provisioning",
+                    "Consider spot/preemptible instances for non-critical workloads"
+                ]
+            
+            prompt = RECOMMENDATION_INSTRUCTIONS + f"""
+Cluster: {cluster.name}
+Provider: {cluster.provider}
+Current monthly cost: ${cluster.total_cost}
+Nodes: {cluster.summary.node_count}
+"""
+            
             user_message = UserMessage(text=prompt)
-            response = await self.llm_chat.send_message(user_message)
+            response = await llm_chat.send_message(user_message)
             # Parse recommendations from response
-            recommendations = [line.strip() for line in response.split('\
-') if line.strip() and any(char.isdigit() for char in line[:3])]
+            recommendations = [line.strip() for line in response.splitlines() if _NUMBERED_LINE.match(line)]
             return recommendations[:5] if recommendations else [
                 "Enable horizontal pod autoscaling for better resource utilization",
                 "Implement resource quotas to prevent over-provisioning",
@@ -185,72 +500,105 @@ class AIAnalysisService:
 ai_service = AIAnalysisService()
 
 # Mock data generators
-def generate_mock_cluster_nodes(count: int = 5) -> List[ClusterNode]:
-    node_types = ["t3.medium", "t3.large", "t3.xlarge", "m5.large", "m5.xlarge"]
-    zones = ["us-east-1a", "us-east-1b", "us-east-1c"]
+_NODE_TYPES = ["t3.medium", "t3.large", "t3.xlarge", "m5.large", "m5.xlarge"]
+_ZONES = ["us-east-1a", "us-east-1b", "us-east-1c"]
+_CPU_CAPACITY = {"t3.medium": 2, "t3.large": 2, "t3.xlarge": 4, "m5.large": 2, "m5.xlarge": 4}
+_MEMORY_CAPACITY = {"t3.medium": 4, "t3.large": 8, "t3.xlarge": 16, "m5.large": 8, "m5.xlarge": 16}
+_COST_PER_HOUR = {"t3.medium": 0.0416, "t3.large": 0.0832, "t3.xlarge": 0.1664, "m5.large": 0.096, "m5.xlarge": 0.192}
+_PROVIDERS = ["AWS", "GCP", "Azure"]
+_REGIONS = ["us-east-1", "us-west-2", "europe-west1"]
+
+_rng = np.random.default_rng()
+
+def _draw_mock_nodes(node_counts: List[int]) -> List[List[ClusterNode]]:
+    """Draw random node attributes for several clusters at once and split them per cluster"""
+    total_nodes = sum(node_counts)
+    node_types = [_NODE_TYPES[i] for i in _rng.integers(len(_NODE_TYPES), size=total_nodes)]
+    zones = [_ZONES[i] for i in _rng.integers(len(_ZONES), size=total_nodes)]
+    cpu_usages = _rng.uniform(20, 80, size=total_nodes).tolist()
+    memory_usages = _rng.uniform(30, 85, size=total_nodes).tolist()
     
-    nodes = []
-    for i in range(count):
-        node_type = random.choice(node_types)
-        cpu_capacity = {"t3.medium": 2, "t3.large": 2, "t3.xlarge": 4, "m5.large": 2, "m5.xlarge": 4}[node_type]
-        memory_capacity = {"t3.medium": 4, "t3.large": 8, "t3.xlarge": 16, "m5.large": 8, "m5.xlarge": 16}[node_type]
-        cost_per_hour = {"t3.medium": 0.0416, "t3.large": 0.0832, "t3.xlarge": 0.1664, "m5.large": 0.096, "m5.xlarge": 0.192}[node_type]
-        
-        nodes.append(ClusterNode(
-            name=f"node-{i+1}",
-            cpu_capacity=cpu_capacity,
-            memory_capacity=memory_capacity,
-            cpu_usage=random.uniform(20, 80),
-            memory_usage=random.uniform(30, 85),
-            cost_per_hour=cost_per_hour,
-            node_type=node_type,
-            zone=random.choice(zones),
-            status="Ready"
-        ))
+    node_groups = []
+    offset = 0
+    for count in node_counts:
+        nodes = []
+        for i in range(count):
+            j = offset + i
+            node_type = node_types[j]
+            nodes.append(ClusterNode(
+                name=f"node-{i+1}",
+                cpu_capacity=_CPU_CAPACITY[node_type],
+                memory_capacity=_MEMORY_CAPACITY[node_type],
+                cpu_usage=cpu_usages[j],
+                memory_usage=memory_usages[j],
+                cost_per_hour=_COST_PER_HOUR[node_type],
+                node_type=node_type,
+                zone=zones[j],
+                status="Ready"
+            ))
+        node_groups.append(nodes)
+        offset += count
     
-    return nodes
+    return node_groups
 
 def generate_mock_clusters(count: int = 3) -> List[ClusterInfo]:
-    providers = ["AWS", "GCP", "Azure"]
-    regions = ["us-east-1", "us-west-2", "europe-west1"]
+    node_counts = _rng.integers(3, 9, size=count).tolist()
+    providers = _rng.integers(len(_PROVIDERS), size=count).tolist()
+    regions = _rng.integers(len(_REGIONS), size=count).tolist()
     
     clusters = []
-    for i in range(count):
-        nodes = generate_mock_cluster_nodes(random.randint(3, 8))
+    for i, nodes in enumerate(_draw_mock_nodes(node_counts)):
         total_cost = sum(node.cost_per_hour * 24 * 30 for node in nodes)  # Monthly cost
         
         clusters.append(ClusterInfo(
             name=f"production-cluster-{i+1}",
-            provider=random.choice(providers),
-            region=random.choice(regions),
+            provider=_PROVIDERS[providers[i]],
+            region=_REGIONS[regions[i]],
             nodes=nodes,
-            total_cost=total_cost
+            total_cost=total_cost,
+            summary=summarize_nodes(nodes)
         ))
     
     return clusters
 
+@functools.lru_cache(maxsize=1)
+def _compute_cost_trends(day_key: str, base_cost: float) -> tuple:
+    today = date.fromisoformat(day_key)
+    cost_trends = []
+    for i in range(7):
+        day = today - timedelta(days=6-i)
+        daily_cost = base_cost * random.uniform(0.9, 1.1)
+        cost_trends.append({
+            "date": day.isoformat(),
+            "cost": round(daily_cost, 2)
+        })
+    return tuple(cost_trends)
+
+def format_sse(payload: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
 # API Endpoints
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "message": "Kubernetes Cost Optimizer API is running"}
 
-@app.get("/api/clusters", response_model=List[ClusterInfo])
+@app.get("/api/clusters", response_model=List[ClusterSummary])
+@cache(expire=CACHE_TTL_SECONDS, namespace="clusters")
 async def get_clusters():
     """Get all Kubernetes clusters with cost information"""
     try:
-        clusters = await db.clusters.find().to_list(length=None)
+        clusters = await db.clusters.find({}, projection=CLUSTER_SUMMARY_PROJECTION, batch_size=LIST_BATCH_SIZE).to_list(length=None)
         if not clusters:
             # Generate and store mock data
             mock_clusters = generate_mock_clusters()
-            for cluster_data in mock_clusters:
-                cluster_dict = cluster_data.dict()
-                cluster_dict['created_at'] = cluster_dict['created_at'].isoformat()
-                for node in cluster_dict['nodes']:
-                    node['id'] = node.get('id', str(uuid.uuid4()))
-                await db.clusters.insert_one(cluster_dict)
-            clusters = await db.clusters.find().to_list(length=None)
+            docs = [cluster.model_dump(mode='json') for cluster in mock_clusters]
+            await db.clusters.insert_many(docs, ordered=False)
+            # An overview fetched while the collection was empty cached mock totals
+            await invalidate_cache("dashboard")
+            # The generated models are already validated; no need to read them back
+            return [ClusterSummary.model_validate(cluster, from_attributes=True) for cluster in mock_clusters]
         
-        return [ClusterInfo(**cluster) for cluster in clusters]
+        return [ClusterSummary(**cluster) for cluster in clusters]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching clusters: {str(e)}")
 
@@ -262,38 +610,63 @@ async def get_cluster(cluster_id: str):
         raise HTTPException(status_code=404, detail="Cluster not found")
     return ClusterInfo(**cluster)
 
+async def _persist_analysis(analysis_dict: Dict[str, Any]):
+    try:
+        await db.cost_analyses.insert_one(analysis_dict)
+    except Exception as e:
+        # Runs after the response, so the client can't be told; make it visible in logs
+        print(f"Warning: failed to store analysis {analysis_dict['id']}: {str(e)}")
+
 @app.post("/api/clusters/{cluster_id}/analyze")
-async def analyze_cluster(cluster_id: str):
-    """Generate AI-powered cost analysis for a cluster"""
+async def analyze_cluster(cluster_id: str, background_tasks: BackgroundTasks):
+    """Stream an AI-powered cost analysis for a cluster as server-sent events
+
+    Emits "insights" events with text chunks as the LLM produces them, then a
+    final "analysis" event carrying the CostAnalysis, or an "error" event if
+    the analysis fails after streaming has started. The analysis is written
+    to Mongo only after the stream completes, so nothing is stored if the
+    client disconnects before the final event.
+    """
     cluster = await db.clusters.find_one({"id": cluster_id})
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
     
     cluster_obj = ClusterInfo(**cluster)
     
-    # Generate AI analysis
-    ai_insights = await ai_service.analyze_cluster_costs(cluster_obj)
-    recommendations = await ai_service.generate_recommendations(cluster_obj)
-    
-    # Calculate potential savings (mock calculation)
-    current_utilization = sum(node['cpu_usage'] for node in cluster['nodes']) / len(cluster['nodes'])
-    potential_savings = cluster_obj.total_cost * (100 - current_utilization) / 100 * 0.3
-    
-    analysis = CostAnalysis(
-        cluster_id=cluster_id,
-        analysis_type="comprehensive",
-        recommendations=recommendations,
-        potential_savings=potential_savings,
-        confidence_score=random.uniform(85, 95),
-        ai_insights=ai_insights
-    )
+    # Recommendations are generated concurrently while the insights stream
+    recommendations_task = asyncio.create_task(ai_service.generate_recommendations(cluster_obj))
     
-    # Store analysis
-    analysis_dict = analysis.dict()
-    analysis_dict['created_at'] = analysis_dict['created_at'].isoformat()
-    await db.cost_analyses.insert_one(analysis_dict)
+    async def event_stream():
+        try:
+            chunks = []
+            async for chunk in ai_service.analyze_cluster_costs_stream(cluster_obj):
+                chunks.append(chunk)
+                yield format_sse({"type": "insights", "text": chunk})
+            recommendations = await recommendations_task
+            
+            # Calculate potential savings (mock calculation)
+            current_utilization = cluster_obj.summary.avg_cpu_usage
+            potential_savings = cluster_obj.total_cost * (100 - current_utilization) / 100 * 0.3
+            
+            analysis = CostAnalysis(
+                cluster_id=cluster_id,
+                analysis_type="comprehensive",
+                recommendations=recommendations,
+                potential_savings=potential_savings,
+                confidence_score=random.uniform(85, 95),
+                ai_insights="".join(chunks)
+            )
+            analysis_dict = analysis.model_dump(mode='json')
+            # Store analysis after the response completes, off the critical path
+            background_tasks.add_task(_persist_analysis, analysis_dict)
+            yield format_sse({"type": "analysis", "analysis": analysis_dict})
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield format_sse({"type": "error", "detail": f"Error analyzing cluster: {str(e)}"})
+        finally:
+            recommendations_task.cancel()
     
-    return analysis
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/api/clusters/{cluster_id}/recommendations", response_model=List[OptimizationRecommendation])
 async def get_recommendations(cluster_id: str):
@@ -336,35 +709,60 @@ async def get_recommendations(cluster_id: str):
     return recommendations
 
 @app.get("/api/dashboard/overview")
+@cache(expire=CACHE_TTL_SECONDS, namespace="dashboard")
 async def get_dashboard_overview():
     """Get dashboard overview with key metrics"""
-    clusters = await db.clusters.find().to_list(length=None)
-    
-    if not clusters:
-        clusters = [cluster.dict() for cluster in generate_mock_clusters()]
+    # Single round-trip: per-cluster totals come from the precomputed summary,
+    # falling back to the raw node arrays for documents stored without one
+    pipeline = [
+        {"$project": {
+            "_id": 0,
+            "total_cost": 1,
+            "node_count": {"$ifNull": ["$summary.node_count", {"$size": {"$ifNull": ["$nodes", []]}}]},
+            "cpu_usage_sum": {"$ifNull": [
+                {"$multiply": ["$summary.avg_cpu_usage", "$summary.node_count"]},
+                {"$sum": "$nodes.cpu_usage"}
+            ]},
+            "memory_usage_sum": {"$ifNull": [
+                {"$multiply": ["$summary.avg_memory_usage", "$summary.node_count"]},
+                {"$sum": "$nodes.memory_usage"}
+            ]}
+        }},
+        {"$group": {
+            "_id": None,
+            "total_clusters": {"$sum": 1},
+            "total_cost": {"$sum": "$total_cost"},
+            "total_nodes": {"$sum": "$node_count"},
+            "cpu_usage_sum": {"$sum": "$cpu_usage_sum"},
+            "memory_usage_sum": {"$sum": "$memory_usage_sum"}
+        }}
+    ]
+    cursor = await db.clusters.aggregate(pipeline)
+    results = await cursor.to_list(length=1)
     
-    total_clusters = len(clusters)
-    total_cost = sum(cluster.get('total_cost', 0) for cluster in clusters)
-    total_nodes = sum(len(cluster.get('nodes', [])) for cluster in clusters)
+    if results:
+        totals = results[0]
+    else:
+        clusters = generate_mock_clusters()
+        totals = {
+            "total_clusters": len(clusters),
+            "total_cost": sum(cluster.total_cost for cluster in clusters),
+            "total_nodes": sum(cluster.summary.node_count for cluster in clusters),
+            "cpu_usage_sum": sum(cluster.summary.avg_cpu_usage * cluster.summary.node_count for cluster in clusters),
+            "memory_usage_sum": sum(cluster.summary.avg_memory_usage * cluster.summary.node_count for cluster in clusters)
+        }
     
-    # Calculate average utilization
-    all_nodes = []
-    for cluster in clusters:
-        all_nodes.extend(cluster.get('nodes', []))
+    total_clusters = totals["total_clusters"]
+    total_cost = totals["total_cost"]
+    total_nodes = totals["total_nodes"]
     
-    avg_cpu_utilization = sum(node.get('cpu_usage', 0) for node in all_nodes) / len(all_nodes) if all_nodes else 0
-    avg_memory_utilization = sum(node.get('memory_usage', 0) for node in all_nodes) / len(all_nodes) if all_nodes else 0
+    # Node-weighted average utilization across all clusters
+    avg_cpu_utilization = totals["cpu_usage_sum"] / total_nodes if total_nodes else 0
+    avg_memory_utilization = totals["memory_usage_sum"] / total_nodes if total_nodes else 0
     
-    # Mock cost trends (last 7 days)
-    cost_trends = []
-    base_cost = total_cost / 30  # Daily cost
-    for i in range(7):
-        date = (datetime.now(timezone.utc) - timedelta(days=6-i)).date()
-        daily_cost = base_cost * random.uniform(0.9, 1.1)
-        cost_trends.append({
-            "date": date.isoformat(),
-            "cost": round(daily_cost, 2)
-        })
+    # Mock cost trends (last 7 days), stable for the rest of the day
+    day_key = datetime.now(timezone.utc).date().isoformat()
+    cost_trends = _compute_cost_trends(day_key, round(total_cost / 30, 2))
     
     return {
         "total_clusters": total_clusters,
@@ -380,11 +778,11 @@ async def get_dashboard_overview():
 @app.get("/api/alerts", response_model=List[AnomalyAlert])
 async def get_alerts():
     """Get cost anomaly alerts"""
-    alerts = await db.alerts.find().to_list(length=None)
+    alerts = await db.alerts.find({}, projection={"_id": 0}, batch_size=LIST_BATCH_SIZE).to_list(length=None)
     
     if not alerts:
         # Generate mock alerts
-        clusters = await db.clusters.find().to_list(length=None)
+        clusters = await db.clusters.find({}, projection={"_id": 0, "id": 1, "name": 1}).to_list(length=None)
         if clusters:
             mock_alerts = []
             for i in range(random.randint(3, 6)):
@@ -398,12 +796,9 @@ async def get_alerts():
                 mock_alerts.append(alert)
             
             # Store alerts
-            for alert in mock_alerts:
-                alert_dict = alert.dict()
-                alert_dict['detected_at'] = alert_dict['detected_at'].isoformat()
-                await db.alerts.insert_one(alert_dict)
-            
-            alerts = await db.alerts.find().to_list(length=None)
+            docs = [alert.model_dump(mode='json') for alert in mock_alerts]
+            await db.alerts.insert_many(docs, ordered=False)
+            return mock_alerts
     
     return [AnomalyAlert(**alert) for alert in alerts]
 
@@ -423,7 +818,7 @@ async def resolve_alert(alert_id: str):
 @app.get("/api/cost-analysis")
 async def get_cost_analysis():
     """Get comprehensive cost analysis across all clusters"""
-    analyses = await db.cost_analyses.find().to_list(length=None)
+    analyses = await db.cost_analyses.find({}, projection={"_id": 0}, batch_size=LIST_BATCH_SIZE).to_list(length=None)
     return [CostAnalysis(**analysis) for analysis in analyses]
 
 if __name__ == "__main__":